@@ -0,0 +1,65 @@
+"""
+Accuracy versus memory benchmark for the probabilistic value types.
+Compares HyperLogLog and BloomFilter against exact Python sets.
+"""
+
+import sys
+from probabilistic import HyperLogLog, BloomFilter
+
+
+def set_memory(items):
+    """Bytes held by a set of items: the hash table plus the member strings"""
+    exact = set(items)
+    return exact, sys.getsizeof(exact) + sum(sys.getsizeof(item) for item in exact)
+
+
+def build_hll(items):
+    hll = HyperLogLog()
+    for item in items:
+        hll.add(item)
+    return hll
+
+
+def build_bloom(items, error_rate):
+    bloom = BloomFilter(len(items), error_rate)
+    for item in items:
+        bloom.add(item)
+    return bloom
+
+
+def bench_hyperloglog(sizes):
+    print("HyperLogLog (PFADD/PFCOUNT) vs set")
+    print("%10s %12s %12s %10s %10s %9s" % (
+        "n", "set bytes", "hll bytes", "encoding", "estimate", "error"))
+    for n in sizes:
+        items = ["visitor:%d" % i for i in range(n)]
+        exact, set_bytes = set_memory(items)
+        hll = build_hll(items)
+        hll_bytes = hll.memory_usage()
+        estimate = hll.count()
+        error = abs(estimate - len(exact)) / float(len(exact))
+        print("%10d %12d %12d %10s %10d %8.2f%%" % (
+            n, set_bytes, hll_bytes, hll.encoding, estimate, error * 100))
+    print()
+
+
+def bench_bloom(n, error_rates, probes=100000):
+    print("Bloom filter (BF.ADD/BF.EXISTS) vs set, n=%d" % n)
+    print("%10s %12s %12s %8s %12s" % (
+        "target", "set bytes", "bloom bytes", "hashes", "measured fp"))
+    items = ["id:%d" % i for i in range(n)]
+    _, set_bytes = set_memory(items)
+    for error_rate in error_rates:
+        bloom = build_bloom(items, error_rate)
+        bloom_bytes = bloom.memory_usage()
+        false_positives = sum("probe:%d" % i in bloom for i in range(probes))
+        print("%9.3f%% %12d %12d %8d %11.3f%%" % (
+            error_rate * 100, set_bytes, bloom_bytes, bloom.num_hashes,
+            false_positives * 100.0 / probes))
+    print()
+
+
+if __name__ == "__main__":
+    scale = int(sys.argv[1]) if len(sys.argv) > 1 else 1
+    bench_hyperloglog([100, 1000, 10000, 100000 * scale])
+    bench_bloom(100000 * scale, [0.1, 0.01, 0.001])
@@ -1,6 +1,7 @@
 from protocalhandler import ProtocolHandler
 from server import Server
 import socket
+from io import BytesIO
 
 class Client(object):
     def __init__(self, host="127.0.0.1", port=31337):
@@ -34,4 +35,15 @@ class Client(object):
         # read and decode response from the server
         resp = self._protocol.handle_request(self._socket_file)
 
-        return resp
\ No newline at end of file
+        return resp
+
+    def execute_many(self, commands):
+        # encode every command into one buffer so the whole batch is sent
+        # in a single write (pipelining), then read one reply per command
+        buf = BytesIO()
+        for command in commands:
+            self._protocol.write_response(buf, list(command))
+        self._socket_file.write(buf.getvalue())
+        self._socket_file.flush()
+
+        return [self._protocol.handle_request(self._socket_file) for _ in commands]
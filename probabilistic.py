@@ -0,0 +1,289 @@
+import math
+from hashlib import blake2b
+
+# HyperLogLog parameters (same layout as Redis): 2^14 registers of 6 bits
+# each, which gives a fixed 12 KB dense representation and a standard error
+# of 1.04 / sqrt(16384) = 0.81%.
+HLL_P = 14
+HLL_Q = 64 - HLL_P
+HLL_REGISTERS = 1 << HLL_P
+HLL_P_MASK = HLL_REGISTERS - 1
+HLL_BITS = 6
+HLL_REGISTER_MAX = (1 << HLL_BITS) - 1
+HLL_DENSE_SIZE = HLL_REGISTERS * HLL_BITS // 8
+HLL_ALPHA_INF = 0.5 / math.log(2)
+
+# Sparse entries are packed in 3 bytes: 14 bits of register index and
+# 6 bits of register value. Once the sparse form would grow past this many
+# bytes it is converted to the dense form (Redis' hll-sparse-max-bytes).
+HLL_SPARSE_ENTRY_SIZE = 3
+HLL_SPARSE_MAX_BYTES = 3000
+
+HLL_SPARSE = "sparse"
+HLL_DENSE = "dense"
+
+# Bloom filter defaults used when BF.ADD / BF.MADD create a filter
+# implicitly (same defaults as RedisBloom).
+BLOOM_DEFAULT_ERROR_RATE = 0.01
+BLOOM_DEFAULT_CAPACITY = 100
+
+# Limits on BF.RESERVE parameters: the bitmap is capped at 2^27 bits
+# (16 MB, about 14 million items at 1% error) and the error rate floor keeps
+# the number of hash functions per lookup around 30 at most.
+BLOOM_MAX_BITS = 1 << 27
+BLOOM_MIN_ERROR_RATE = 1e-9
+
+
+def _hash64(element):
+    digest = blake2b(str(element).encode("utf-8"), digest_size=8).digest()
+    return int.from_bytes(digest, "little")
+
+
+def _hash128(element):
+    digest = blake2b(str(element).encode("utf-8"), digest_size=16).digest()
+    return int.from_bytes(digest[:8], "little"), int.from_bytes(digest[8:], "little")
+
+
+def _hll_sigma(x):
+    if x == 1.0:
+        return math.inf
+    y = 1.0
+    z = x
+    while True:
+        x *= x
+        z_prev = z
+        z += x * y
+        y += y
+        if z_prev == z:
+            return z
+
+
+def _hll_tau(x):
+    if x == 0.0 or x == 1.0:
+        return 0.0
+    y = 1.0
+    z = 1 - x
+    while True:
+        x = math.sqrt(x)
+        z_prev = z
+        y *= 0.5
+        z -= (1 - x) ** 2 * y
+        if z_prev == z:
+            return z / 3
+
+
+class HyperLogLog(object):
+    """Cardinality estimator with a sparse and a 12 KB dense encoding.
+
+    A new HyperLogLog starts sparse (a sorted run of 3-byte entries, one per
+    non-zero register) and is promoted to the dense 6-bit register array
+    once it grows past HLL_SPARSE_MAX_BYTES.
+    """
+
+    def __init__(self):
+        self.encoding = HLL_SPARSE
+        self._registers = bytearray()
+        self._cached_count = 0
+
+    def add(self, element):
+        """Add an element, return True if any register was changed"""
+        h = _hash64(element)
+        index = h & HLL_P_MASK
+        # Rank is the position of the first set bit in the remaining bits;
+        # forcing bit Q keeps it in range 1..Q+1 when they are all zero.
+        rest = (h >> HLL_P) | (1 << HLL_Q)
+        rank = (rest & -rest).bit_length()
+        return self._set_max(index, rank)
+
+    def count(self):
+        if self._cached_count is None:
+            self._cached_count = self._estimate()
+        return self._cached_count
+
+    def merge(self, other):
+        """Fold another HyperLogLog into this one (register-wise max)"""
+        changed = False
+        if other.encoding == HLL_DENSE:
+            if self.encoding == HLL_SPARSE:
+                self._to_dense()
+            for index in range(HLL_REGISTERS):
+                rank = other._dense_get(index)
+                if rank > self._dense_get(index):
+                    self._dense_set(index, rank)
+                    changed = True
+        else:
+            for index, rank in other._sparse_entries():
+                if self._set_max(index, rank):
+                    changed = True
+        if changed:
+            self._cached_count = None
+        return changed
+
+    def copy(self):
+        hll = HyperLogLog()
+        hll.encoding = self.encoding
+        hll._registers = bytearray(self._registers)
+        hll._cached_count = self._cached_count
+        return hll
+
+    def memory_usage(self):
+        return len(self._registers)
+
+    def _set_max(self, index, rank):
+        if self.encoding == HLL_SPARSE:
+            changed = self._sparse_set_max(index, rank)
+        elif rank > self._dense_get(index):
+            self._dense_set(index, rank)
+            changed = True
+        else:
+            changed = False
+        if changed:
+            self._cached_count = None
+        return changed
+
+    # Dense encoding: registers packed little-endian, 6 bits each
+
+    def _dense_get(self, index):
+        bit = index * HLL_BITS
+        pos = bit >> 3
+        shift = bit & 7
+        value = self._registers[pos] >> shift
+        if shift > 8 - HLL_BITS:
+            value |= self._registers[pos + 1] << (8 - shift)
+        return value & HLL_REGISTER_MAX
+
+    def _dense_set(self, index, rank):
+        bit = index * HLL_BITS
+        pos = bit >> 3
+        shift = bit & 7
+        regs = self._registers
+        regs[pos] = (regs[pos] & ~(HLL_REGISTER_MAX << shift) & 0xff) | ((rank << shift) & 0xff)
+        if shift > 8 - HLL_BITS:
+            high = 8 - shift
+            regs[pos + 1] = (regs[pos + 1] & ~(HLL_REGISTER_MAX >> high) & 0xff) | (rank >> high)
+
+    def _to_dense(self):
+        entries = list(self._sparse_entries())
+        self.encoding = HLL_DENSE
+        self._registers = bytearray(HLL_DENSE_SIZE)
+        for index, rank in entries:
+            self._dense_set(index, rank)
+
+    # Sparse encoding: 3-byte entries (index << 6 | rank) sorted by index
+
+    def _sparse_entries(self):
+        regs = self._registers
+        for pos in range(0, len(regs), HLL_SPARSE_ENTRY_SIZE):
+            entry = int.from_bytes(regs[pos:pos + HLL_SPARSE_ENTRY_SIZE], "big")
+            yield entry >> HLL_BITS, entry & HLL_REGISTER_MAX
+
+    def _sparse_set_max(self, index, rank):
+        regs = self._registers
+        lo = 0
+        hi = len(regs) // HLL_SPARSE_ENTRY_SIZE
+        while lo < hi:
+            mid = (lo + hi) // 2
+            pos = mid * HLL_SPARSE_ENTRY_SIZE
+            entry = int.from_bytes(regs[pos:pos + HLL_SPARSE_ENTRY_SIZE], "big")
+            entry_index = entry >> HLL_BITS
+            if entry_index == index:
+                if rank <= entry & HLL_REGISTER_MAX:
+                    return False
+                regs[pos:pos + HLL_SPARSE_ENTRY_SIZE] = self._sparse_pack(index, rank)
+                return True
+            if entry_index < index:
+                lo = mid + 1
+            else:
+                hi = mid
+
+        if len(regs) + HLL_SPARSE_ENTRY_SIZE > HLL_SPARSE_MAX_BYTES:
+            self._to_dense()
+            self._dense_set(index, rank)
+            return True
+        pos = lo * HLL_SPARSE_ENTRY_SIZE
+        regs[pos:pos] = self._sparse_pack(index, rank)
+        return True
+
+    def _sparse_pack(self, index, rank):
+        return ((index << HLL_BITS) | rank).to_bytes(HLL_SPARSE_ENTRY_SIZE, "big")
+
+    def _histogram(self):
+        histogram = [0] * (HLL_Q + 2)
+        if self.encoding == HLL_DENSE:
+            for index in range(HLL_REGISTERS):
+                histogram[self._dense_get(index)] += 1
+        else:
+            used = 0
+            for _, rank in self._sparse_entries():
+                histogram[rank] += 1
+                used += 1
+            histogram[0] = HLL_REGISTERS - used
+        return histogram
+
+    def _estimate(self):
+        # Ertl's improved estimator, as used by Redis' hllCount()
+        histogram = self._histogram()
+        m = float(HLL_REGISTERS)
+        z = m * _hll_tau((m - histogram[HLL_Q + 1]) / m)
+        for j in range(HLL_Q, 0, -1):
+            z += histogram[j]
+            z *= 0.5
+        z += m * _hll_sigma(histogram[0] / m)
+        return int(round(HLL_ALPHA_INF * m * m / z))
+
+
+class BloomFilter(object):
+    """Fixed-size Bloom filter backed by a bytearray bitmap.
+
+    The bitmap size and number of hash functions are derived from the
+    expected capacity and the target false positive rate.
+    """
+
+    def __init__(self, capacity=BLOOM_DEFAULT_CAPACITY, error_rate=BLOOM_DEFAULT_ERROR_RATE):
+        if capacity <= 0:
+            raise ValueError("capacity must be positive")
+        if not 0 < error_rate < 1:
+            raise ValueError("error rate must be between 0 and 1")
+        if error_rate < BLOOM_MIN_ERROR_RATE:
+            raise ValueError("error rate must be at least %g" % BLOOM_MIN_ERROR_RATE)
+        self.capacity = capacity
+        self.error_rate = error_rate
+        try:
+            num_bits = math.ceil(-capacity * math.log(error_rate) / (math.log(2) ** 2))
+        except OverflowError:
+            num_bits = math.inf
+        if num_bits > BLOOM_MAX_BITS:
+            raise ValueError("filter bitmap would exceed %d bits" % BLOOM_MAX_BITS)
+        self.num_bits = int(num_bits)
+        self.num_hashes = max(1, int(round(self.num_bits / capacity * math.log(2))))
+        self.size = 0
+        self._bits = bytearray((self.num_bits + 7) // 8)
+
+    def add(self, item):
+        """Add an item, return True if it was not already (probably) present"""
+        added = False
+        bits = self._bits
+        for bit in self._positions(item):
+            mask = 1 << (bit & 7)
+            if not bits[bit >> 3] & mask:
+                bits[bit >> 3] |= mask
+                added = True
+        if added:
+            self.size += 1
+        return added
+
+    def __contains__(self, item):
+        bits = self._bits
+        for bit in self._positions(item):
+            if not bits[bit >> 3] & (1 << (bit & 7)):
+                return False
+        return True
+
+    def memory_usage(self):
+        return len(self._bits)
+
+    def _positions(self, item):
+        # Kirsch-Mitzenmacher double hashing: k indexes from two hashes
+        h1, h2 = _hash128(item)
+        for i in range(self.num_hashes):
+            yield (h1 + i * h2) % self.num_bits
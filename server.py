@@ -3,6 +3,9 @@ from gevent.pool import Pool
 from gevent.server import StreamServer
 
 from protocalhandler import  ProtocolHandler, Disconnect, CommandError, Error
+from probabilistic import HyperLogLog, BloomFilter
+
+WRONGTYPE = "WRONGTYPE Operation against a key holding the wrong kind of value"
 
 class Server(object):
     def __init__(self, host="127.0.0.1", port=31337, max_client=64):
@@ -19,12 +22,22 @@ class Server(object):
             "SET": self._set,
             "DELETE":self._delete,
             "PING": self._ping,
+            "PFADD": self._pfadd,
+            "PFCOUNT": self._pfcount,
+            "PFMERGE": self._pfmerge,
+            "BF.RESERVE": self._bf_reserve,
+            "BF.ADD": self._bf_add,
+            "BF.MADD": self._bf_madd,
+            "BF.EXISTS": self._bf_exists,
         }
     
     def _get(self,data):
         if len(data) != 2:
             raise CommandError("ERR Wrong number of arguments for GET")
-        return self._kv.get(data[1])
+        value = self._kv.get(data[1])
+        if isinstance(value, (HyperLogLog, BloomFilter)):
+            raise CommandError(WRONGTYPE)
+        return value
 
     def _set(self,data):
         if len(data) != 3:
@@ -45,6 +58,102 @@ class Server(object):
             raise CommandError("ERR Wrong number of arguments for PING")
         return "PONG"
     
+    def _lookup(self, key, value_type):
+        # Return the value at key, or None, checking it has the expected type
+        value = self._kv.get(key)
+        if value is not None and not isinstance(value, value_type):
+            raise CommandError(WRONGTYPE)
+        return value
+
+    def _pfadd(self, data):
+        if len(data) < 2:
+            raise CommandError("ERR Wrong number of arguments for PFADD")
+        hll = self._lookup(data[1], HyperLogLog)
+        changed = False
+        if hll is None:
+            hll = self._kv[data[1]] = HyperLogLog()
+            changed = True
+        for element in data[2:]:
+            if hll.add(element):
+                changed = True
+        return 1 if changed else 0
+
+    def _pfcount(self, data):
+        if len(data) < 2:
+            raise CommandError("ERR Wrong number of arguments for PFCOUNT")
+        hlls = [self._lookup(key, HyperLogLog) for key in data[1:]]
+        hlls = [hll for hll in hlls if hll is not None]
+        if not hlls:
+            return 0
+        if len(hlls) == 1:
+            return hlls[0].count()
+        union = hlls[0].copy()
+        for hll in hlls[1:]:
+            union.merge(hll)
+        return union.count()
+
+    def _pfmerge(self, data):
+        if len(data) < 2:
+            raise CommandError("ERR Wrong number of arguments for PFMERGE")
+        dest = self._lookup(data[1], HyperLogLog)
+        sources = [self._lookup(key, HyperLogLog) for key in data[2:]]
+        if dest is None:
+            dest = self._kv[data[1]] = HyperLogLog()
+        for hll in sources:
+            if hll is not None and hll is not dest:
+                dest.merge(hll)
+        return "OK"
+
+    def _bf_reserve(self, data):
+        if len(data) != 4:
+            raise CommandError("ERR Wrong number of arguments for BF.RESERVE")
+        try:
+            error_rate = float(data[2])
+        except ValueError:
+            raise CommandError("ERR bad error rate")
+        try:
+            capacity = int(data[3])
+        except ValueError:
+            raise CommandError("ERR bad capacity")
+        if not 0 < error_rate < 1:
+            raise CommandError("ERR error rate should be between 0 and 1")
+        if capacity <= 0:
+            raise CommandError("ERR capacity should be larger than 0")
+        if data[1] in self._kv:
+            raise CommandError("ERR item exists")
+        try:
+            bloom = BloomFilter(capacity, error_rate)
+        except ValueError as exc:
+            raise CommandError("ERR %s" % exc)
+        self._kv[data[1]] = bloom
+        return "OK"
+
+    def _bloom_for_write(self, key):
+        bloom = self._lookup(key, BloomFilter)
+        if bloom is None:
+            bloom = self._kv[key] = BloomFilter()
+        return bloom
+
+    def _bf_add(self, data):
+        if len(data) != 3:
+            raise CommandError("ERR Wrong number of arguments for BF.ADD")
+        bloom = self._bloom_for_write(data[1])
+        return 1 if bloom.add(data[2]) else 0
+
+    def _bf_madd(self, data):
+        if len(data) < 3:
+            raise CommandError("ERR Wrong number of arguments for BF.MADD")
+        bloom = self._bloom_for_write(data[1])
+        return [1 if bloom.add(item) else 0 for item in data[2:]]
+
+    def _bf_exists(self, data):
+        if len(data) != 3:
+            raise CommandError("ERR Wrong number of arguments for BF.EXISTS")
+        bloom = self._lookup(data[1], BloomFilter)
+        if bloom is None:
+            return 0
+        return 1 if data[2] in bloom else 0
+
     def connection_handler(self,conn, address):
         socket_file = conn.makefile('rwb')
         print("connection established.....")
@@ -0,0 +1,188 @@
+from bisect import bisect, insort
+from concurrent.futures import ThreadPoolExecutor
+from hashlib import md5
+
+from client import Client
+from protocalhandler import Error
+
+DEFAULT_REPLICAS = 160
+
+# Commands whose arguments after the name are all keys; every other command
+# is routed by its first argument only.
+MULTI_KEY_COMMANDS = set(["PFCOUNT", "PFMERGE"])
+
+
+def _ring_hash(value):
+    return int.from_bytes(md5(value.encode("utf-8")).digest()[:8], "big")
+
+
+class HashRing(object):
+    """Consistent hash ring mapping keys to nodes.
+
+    Every node is placed on the ring at `replicas` virtual points, so adding
+    or removing one of N nodes only moves about 1/N of the keys.
+    """
+
+    def __init__(self, nodes=(), replicas=DEFAULT_REPLICAS):
+        self.replicas = replicas
+        self._points = []
+        self._owners = {}
+        self._nodes = set()
+        for node in nodes:
+            self.add_node(node)
+
+    def add_node(self, node):
+        if node in self._nodes:
+            return
+        self._nodes.add(node)
+        for i in range(self.replicas):
+            point = _ring_hash("%s#%d" % (node, i))
+            # Skip the (unlikely) collision rather than steal another point
+            if point in self._owners:
+                continue
+            self._owners[point] = node
+            insort(self._points, point)
+
+    def remove_node(self, node):
+        if node not in self._nodes:
+            return
+        self._nodes.discard(node)
+        self._points = [p for p in self._points if self._owners[p] != node]
+        self._owners = dict((p, self._owners[p]) for p in self._points)
+
+    def get_node(self, key):
+        if not self._points:
+            raise ValueError("hash ring has no nodes")
+        pos = bisect(self._points, _ring_hash(key))
+        if pos == len(self._points):
+            pos = 0
+        return self._owners[self._points[pos]]
+
+    @property
+    def nodes(self):
+        return set(self._nodes)
+
+    def __len__(self):
+        return len(self._nodes)
+
+
+class ShardedClient(object):
+    """Client that spreads keys over several MiniRedis nodes.
+
+    Commands go to the node owning their key; multi-key commands are only
+    allowed when all keys live on the same node. Batches (mget/mset) are
+    grouped per node, sent as one pipelined request to each node in
+    parallel, and the replies are merged back in key order.
+
+    Adding or removing a node remaps about 1/N of the keys to a different
+    node. No data is moved: the caller must migrate those keys, otherwise
+    they read as missing.
+    """
+
+    def __init__(self, nodes=(("127.0.0.1", 31337),), replicas=DEFAULT_REPLICAS):
+        self._clients = {}
+        self._ring = HashRing(replicas=replicas)
+        self._executor = None
+        self._connected = False
+        for host, port in nodes:
+            self.add_node(host, port)
+
+    def connect(self):
+        for client in self._clients.values():
+            client.connect()
+        self._executor = ThreadPoolExecutor(max_workers=max(1, len(self._clients)))
+        self._connected = True
+
+    def disconnect(self):
+        for client in self._clients.values():
+            client.disconnect()
+        if self._executor:
+            self._executor.shutdown()
+            self._executor = None
+        self._connected = False
+
+    def add_node(self, host, port):
+        # Keys remapped to the new node are not copied from their old node
+        name = "%s:%s" % (host, port)
+        if name in self._clients:
+            return
+        client = Client(host, port)
+        if self._connected:
+            client.connect()
+            self._resize_executor(len(self._clients) + 1)
+        self._clients[name] = client
+        self._ring.add_node(name)
+
+    def remove_node(self, host, port):
+        # Keys stored on the removed node are not copied to their new node
+        name = "%s:%s" % (host, port)
+        client = self._clients.pop(name, None)
+        if client is None:
+            return
+        self._ring.remove_node(name)
+        if self._connected:
+            client.disconnect()
+
+    def get_node(self, key):
+        """Return the "host:port" name of the node owning key"""
+        return self._ring.get_node(key)
+
+    def execute(self, *args):
+        """Run a command on the node owning its key(s).
+
+        Like Client.execute, errors from the command come back as an Error
+        value, including a CROSSSLOT Error when the keys of a multi-key
+        command live on different nodes. Misuse of the client itself (no key,
+        not connected) raises ValueError or ConnectionError.
+        """
+        if len(args) < 2:
+            raise ValueError("ShardedClient can only route commands with a key")
+        self._check_connected()
+        keys = args[1:] if args[0].upper() in MULTI_KEY_COMMANDS else args[1:2]
+        nodes = set(self._ring.get_node(key) for key in keys)
+        if len(nodes) > 1:
+            return Error("CROSSSLOT Keys in request don't hash to the same node")
+        return self._clients[nodes.pop()].execute(*args)
+
+    def mget(self, *keys):
+        return self._scatter_gather([("GET", key) for key in keys])
+
+    def mset(self, mapping):
+        """Set every key in mapping, return "OK" or the first Error.
+
+        MSET is not atomic across nodes: each node's batch is applied
+        independently, so when an Error is returned the keys on the other
+        nodes (and any commands before the failing one) have been written.
+        """
+        results = self._scatter_gather([("SET", key, value) for key, value in mapping.items()])
+        for result in results:
+            if isinstance(result, Error):
+                return result
+        return "OK"
+
+    def _scatter_gather(self, commands):
+        self._check_connected()
+        # Group commands per node, remembering each command's position
+        batches = {}
+        for position, command in enumerate(commands):
+            node = self._ring.get_node(command[1])
+            batches.setdefault(node, []).append((position, command))
+
+        def run_batch(node):
+            batch = batches[node]
+            return batch, self._clients[node].execute_many([command for _, command in batch])
+
+        results = [None] * len(commands)
+        for batch, replies in self._executor.map(run_batch, list(batches)):
+            for (position, _), reply in zip(batch, replies):
+                results[position] = reply
+        return results
+
+    def _check_connected(self):
+        if not self._connected:
+            raise ConnectionError("ShardedClient is not connected")
+
+    def _resize_executor(self, workers):
+        if self._executor:
+            self._executor.shutdown()
+        self._executor = ThreadPoolExecutor(max_workers=max(1, workers))
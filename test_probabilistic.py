@@ -0,0 +1,146 @@
+import unittest
+from probabilistic import (
+    HyperLogLog, BloomFilter, HLL_SPARSE, HLL_DENSE, HLL_DENSE_SIZE,
+    HLL_REGISTERS, HLL_SPARSE_MAX_BYTES, BLOOM_MIN_ERROR_RATE,
+)
+
+
+class TestHyperLogLog(unittest.TestCase):
+    """Unit tests for the HyperLogLog cardinality estimator"""
+
+    def test_empty_count(self):
+        """Test a new HyperLogLog counts zero and uses no registers"""
+        hll = HyperLogLog()
+        self.assertEqual(hll.count(), 0)
+        self.assertEqual(hll.encoding, HLL_SPARSE)
+        self.assertEqual(hll.memory_usage(), 0)
+
+    def test_add_reports_change(self):
+        """Test adding a new element changes registers, re-adding does not"""
+        hll = HyperLogLog()
+        self.assertTrue(hll.add('alice'))
+        self.assertFalse(hll.add('alice'))
+        self.assertEqual(hll.count(), 1)
+
+    def test_small_cardinality_stays_sparse(self):
+        """Test small sets are counted exactly in the sparse encoding"""
+        hll = HyperLogLog()
+        for i in range(100):
+            hll.add('user:%d' % i)
+        self.assertEqual(hll.encoding, HLL_SPARSE)
+        self.assertEqual(hll.count(), 100)
+        self.assertLessEqual(hll.memory_usage(), HLL_SPARSE_MAX_BYTES)
+
+    def test_promotes_to_dense(self):
+        """Test large sets switch to the fixed-size dense encoding"""
+        hll = HyperLogLog()
+        for i in range(5000):
+            hll.add('user:%d' % i)
+        self.assertEqual(hll.encoding, HLL_DENSE)
+        self.assertEqual(hll.memory_usage(), HLL_DENSE_SIZE)
+        self.assertEqual(HLL_DENSE_SIZE, 12288)
+
+    def test_dense_register_packing(self):
+        """Test 6-bit registers round-trip across byte boundaries"""
+        hll = HyperLogLog()
+        hll._to_dense()
+        for index in range(HLL_REGISTERS):
+            hll._dense_set(index, index % 64)
+        for index in range(HLL_REGISTERS):
+            self.assertEqual(hll._dense_get(index), index % 64)
+
+    def test_accuracy(self):
+        """Test large cardinality estimate is within 3% of the truth"""
+        hll = HyperLogLog()
+        for i in range(50000):
+            hll.add('visitor:%d' % i)
+        self.assertAlmostEqual(hll.count(), 50000, delta=50000 * 0.03)
+
+    def test_merge_sparse(self):
+        """Test merging two sparse HyperLogLogs counts the union"""
+        a = HyperLogLog()
+        b = HyperLogLog()
+        for i in range(60):
+            a.add('k%d' % i)
+        for i in range(30, 90):
+            b.add('k%d' % i)
+        a.merge(b)
+        self.assertEqual(a.count(), 90)
+
+    def test_merge_dense_into_sparse(self):
+        """Test merging a dense HyperLogLog promotes the target"""
+        a = HyperLogLog()
+        b = HyperLogLog()
+        a.add('only-in-a')
+        for i in range(20000):
+            b.add('k%d' % i)
+        a.merge(b)
+        self.assertEqual(a.encoding, HLL_DENSE)
+        self.assertAlmostEqual(a.count(), 20001, delta=20001 * 0.03)
+
+    def test_copy_is_independent(self):
+        """Test a copy is not affected by changes to the original"""
+        a = HyperLogLog()
+        a.add('x')
+        b = a.copy()
+        a.add('y')
+        self.assertEqual(b.count(), 1)
+        self.assertEqual(a.count(), 2)
+
+
+class TestBloomFilter(unittest.TestCase):
+    """Unit tests for the Bloom filter"""
+
+    def test_add_and_contains(self):
+        """Test added items are always reported present"""
+        bloom = BloomFilter(1000, 0.01)
+        for i in range(1000):
+            bloom.add('id:%d' % i)
+        for i in range(1000):
+            self.assertIn('id:%d' % i, bloom)
+
+    def test_add_reports_new_items(self):
+        """Test add returns True only the first time an item is seen"""
+        bloom = BloomFilter()
+        self.assertTrue(bloom.add('foo'))
+        self.assertFalse(bloom.add('foo'))
+        self.assertEqual(bloom.size, 1)
+
+    def test_false_positive_rate(self):
+        """Test false positive rate stays close to the configured rate"""
+        bloom = BloomFilter(2000, 0.01)
+        for i in range(2000):
+            bloom.add('member:%d' % i)
+        false_positives = sum('other:%d' % i in bloom for i in range(20000))
+        self.assertLess(false_positives / 20000, 0.02)
+
+    def test_size_follows_error_rate(self):
+        """Test a lower error rate uses a larger bitmap and more hashes"""
+        loose = BloomFilter(1000, 0.1)
+        strict = BloomFilter(1000, 0.001)
+        self.assertGreater(strict.memory_usage(), loose.memory_usage())
+        self.assertGreater(strict.num_hashes, loose.num_hashes)
+
+    def test_invalid_parameters(self):
+        """Test invalid capacity or error rate raises ValueError"""
+        with self.assertRaises(ValueError):
+            BloomFilter(0, 0.01)
+        with self.assertRaises(ValueError):
+            BloomFilter(100, 1.5)
+
+    def test_too_large_bitmap(self):
+        """Test a bitmap over BLOOM_MAX_BITS is rejected before allocating"""
+        with self.assertRaises(ValueError):
+            BloomFilter(10 ** 13, 0.01)
+        with self.assertRaises(ValueError):
+            BloomFilter(10 ** 400, 0.01)
+
+    def test_error_rate_floor(self):
+        """Test error rates below BLOOM_MIN_ERROR_RATE are rejected"""
+        with self.assertRaises(ValueError):
+            BloomFilter(100, 1e-320)
+        self.assertLessEqual(BloomFilter(100, BLOOM_MIN_ERROR_RATE).num_hashes, 30)
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
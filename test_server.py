@@ -118,5 +118,134 @@ class TestServerCommands(unittest.TestCase):
         self.assertEqual(self.server.get_response(['GET', 'key3']), 'value3')
 
 
+    def test_get_integer_value(self):
+        """Test GET returns a value stored from an integer argument"""
+        self.server.get_response(['SET', 'n', 5])
+        self.assertEqual(self.server.get_response(['GET', 'n']), 5)
+
+    def test_get_wrong_type(self):
+        """Test GET on a non-string value raises WRONGTYPE"""
+        self.server.get_response(['PFADD', 'hll', 'a'])
+        with self.assertRaises(CommandError) as context:
+            self.server.get_response(['GET', 'hll'])
+        self.assertIn('WRONGTYPE', str(context.exception))
+
+    def test_pfadd_and_pfcount(self):
+        """Test PFADD reports changes and PFCOUNT estimates cardinality"""
+        self.assertEqual(self.server.get_response(['PFADD', 'hll', 'a', 'b', 'c']), 1)
+        self.assertEqual(self.server.get_response(['PFADD', 'hll', 'a', 'b']), 0)
+        self.assertEqual(self.server.get_response(['PFCOUNT', 'hll']), 3)
+
+    def test_pfadd_creates_empty_key(self):
+        """Test PFADD without elements creates the key"""
+        self.assertEqual(self.server.get_response(['PFADD', 'hll']), 1)
+        self.assertEqual(self.server.get_response(['PFADD', 'hll']), 0)
+        self.assertEqual(self.server.get_response(['PFCOUNT', 'hll']), 0)
+
+    def test_pfadd_integer_elements(self):
+        """Test PFADD accepts integer arguments"""
+        self.assertEqual(self.server.get_response(['PFADD', 'hll', 5, 6]), 1)
+        self.assertEqual(self.server.get_response(['PFADD', 'hll', '5']), 0)
+        self.assertEqual(self.server.get_response(['PFCOUNT', 'hll']), 2)
+
+    def test_pfcount_missing_key(self):
+        """Test PFCOUNT on a missing key returns 0"""
+        self.assertEqual(self.server.get_response(['PFCOUNT', 'nonexistent']), 0)
+
+    def test_pfcount_multiple_keys(self):
+        """Test PFCOUNT with several keys counts the union without merging"""
+        self.server.get_response(['PFADD', 'h1', 'a', 'b'])
+        self.server.get_response(['PFADD', 'h2', 'b', 'c'])
+        self.assertEqual(self.server.get_response(['PFCOUNT', 'h1', 'h2']), 3)
+        self.assertEqual(self.server.get_response(['PFCOUNT', 'h1']), 2)
+
+    def test_pfmerge(self):
+        """Test PFMERGE stores the union in the destination key"""
+        self.server.get_response(['PFADD', 'h1', 'a', 'b'])
+        self.server.get_response(['PFADD', 'h2', 'b', 'c'])
+        self.assertEqual(self.server.get_response(['PFMERGE', 'dest', 'h1', 'h2']), 'OK')
+        self.assertEqual(self.server.get_response(['PFCOUNT', 'dest']), 3)
+
+    def test_pfadd_wrong_type(self):
+        """Test PFADD on a string key raises WRONGTYPE"""
+        self.server.get_response(['SET', 'key', 'value'])
+        with self.assertRaises(CommandError) as context:
+            self.server.get_response(['PFADD', 'key', 'a'])
+        self.assertIn('WRONGTYPE', str(context.exception))
+
+    def test_pfadd_wrong_args(self):
+        """Test PFADD without a key raises error"""
+        with self.assertRaises(CommandError) as context:
+            self.server.get_response(['PFADD'])
+        self.assertIn('Wrong number of arguments for PFADD', str(context.exception))
+
+    def test_bf_add_and_exists(self):
+        """Test BF.ADD creates a filter and BF.EXISTS finds added items"""
+        self.assertEqual(self.server.get_response(['BF.ADD', 'bf', 'foo']), 1)
+        self.assertEqual(self.server.get_response(['BF.ADD', 'bf', 'foo']), 0)
+        self.assertEqual(self.server.get_response(['BF.EXISTS', 'bf', 'foo']), 1)
+        self.assertEqual(self.server.get_response(['BF.EXISTS', 'bf', 'bar']), 0)
+
+    def test_bf_exists_missing_key(self):
+        """Test BF.EXISTS on a missing key returns 0 without creating it"""
+        self.assertEqual(self.server.get_response(['bf.exists', 'bf', 'foo']), 0)
+        self.assertNotIn('bf', self.server._kv)
+
+    def test_bf_madd(self):
+        """Test BF.MADD returns one result per item"""
+        result = self.server.get_response(['BF.MADD', 'bf', 'a', 'b', 'a'])
+        self.assertEqual(result, [1, 1, 0])
+
+    def test_bf_reserve(self):
+        """Test BF.RESERVE creates a filter with the given parameters"""
+        self.assertEqual(self.server.get_response(['BF.RESERVE', 'bf', '0.001', '5000']), 'OK')
+        bloom = self.server._kv['bf']
+        self.assertEqual(bloom.capacity, 5000)
+        self.assertEqual(bloom.error_rate, 0.001)
+
+    def test_bf_reserve_existing_key(self):
+        """Test BF.RESERVE on an existing key raises error"""
+        self.server.get_response(['BF.ADD', 'bf', 'foo'])
+        with self.assertRaises(CommandError) as context:
+            self.server.get_response(['BF.RESERVE', 'bf', '0.01', '100'])
+        self.assertIn('item exists', str(context.exception))
+
+    def test_bf_reserve_bad_error_rate(self):
+        """Test BF.RESERVE rejects error rates outside (0, 1)"""
+        with self.assertRaises(CommandError):
+            self.server.get_response(['BF.RESERVE', 'bf', '2', '100'])
+        with self.assertRaises(CommandError):
+            self.server.get_response(['BF.RESERVE', 'bf', 'abc', '100'])
+
+    def test_bf_reserve_too_large(self):
+        """Test BF.RESERVE rejects filters whose bitmap is too large"""
+        with self.assertRaises(CommandError) as context:
+            self.server.get_response(['BF.RESERVE', 'bf', '0.01', '10000000000000'])
+        self.assertIn('ERR', str(context.exception))
+        with self.assertRaises(CommandError):
+            self.server.get_response(['BF.RESERVE', 'bf', '0.01', '9' * 400])
+        self.assertNotIn('bf', self.server._kv)
+
+    def test_bf_reserve_error_rate_too_small(self):
+        """Test BF.RESERVE rejects error rates that need too many hashes"""
+        with self.assertRaises(CommandError) as context:
+            self.server.get_response(['BF.RESERVE', 'bf', '1e-320', '100'])
+        self.assertIn('ERR', str(context.exception))
+        self.assertNotIn('bf', self.server._kv)
+
+    def test_bf_integer_items(self):
+        """Test BF.ADD/BF.MADD/BF.EXISTS accept integer arguments"""
+        self.assertEqual(self.server.get_response(['BF.ADD', 'bf', 5]), 1)
+        self.assertEqual(self.server.get_response(['BF.EXISTS', 'bf', 5]), 1)
+        self.assertEqual(self.server.get_response(['BF.EXISTS', 'bf', '5']), 1)
+        self.assertEqual(self.server.get_response(['BF.MADD', 'bf', 5, 6]), [0, 1])
+
+    def test_bf_add_wrong_type(self):
+        """Test BF.ADD on a HyperLogLog key raises WRONGTYPE"""
+        self.server.get_response(['PFADD', 'hll', 'a'])
+        with self.assertRaises(CommandError) as context:
+            self.server.get_response(['BF.ADD', 'hll', 'a'])
+        self.assertIn('WRONGTYPE', str(context.exception))
+
 if __name__ == '__main__':
     unittest.main(verbosity=2)
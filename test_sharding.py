@@ -0,0 +1,207 @@
+import socket
+import threading
+import time
+import unittest
+from sharding import HashRing, ShardedClient
+from protocalhandler import Error
+from server import Server
+
+NODE_PORTS = (31341, 31342, 31343)
+
+
+def run_server(port):
+    """Start a server on the given port (blocks, run in a thread)"""
+    Server(port=port).run()
+
+
+def wait_for_port(port, timeout=5):
+    """Wait until something is listening on port"""
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            socket.create_connection(("127.0.0.1", port), timeout=0.5).close()
+            return
+        except OSError:
+            time.sleep(0.05)
+    raise RuntimeError("server on port %d did not start" % port)
+
+
+class TestHashRing(unittest.TestCase):
+    """Unit tests for the consistent hash ring"""
+
+    def setUp(self):
+        self.keys = ['key:%d' % i for i in range(10000)]
+
+    def test_empty_ring(self):
+        """Test looking up a key on an empty ring raises ValueError"""
+        with self.assertRaises(ValueError):
+            HashRing().get_node('key')
+
+    def test_lookup_is_stable(self):
+        """Test the same key always maps to the same node"""
+        ring = HashRing(['a', 'b', 'c'])
+        self.assertEqual(ring.get_node('user:1'), ring.get_node('user:1'))
+        self.assertEqual(ring.get_node('user:1'), HashRing(['c', 'b', 'a']).get_node('user:1'))
+
+    def test_balanced_distribution(self):
+        """Test virtual nodes spread keys roughly evenly"""
+        ring = HashRing(['a', 'b', 'c', 'd'])
+        counts = {}
+        for key in self.keys:
+            node = ring.get_node(key)
+            counts[node] = counts.get(node, 0) + 1
+        self.assertEqual(len(counts), 4)
+        for count in counts.values():
+            self.assertAlmostEqual(count, 2500, delta=2500 * 0.25)
+
+    def test_add_node_moves_about_one_nth(self):
+        """Test adding a fifth node only moves keys to the new node"""
+        ring = HashRing(['a', 'b', 'c', 'd'])
+        before = dict((key, ring.get_node(key)) for key in self.keys)
+        ring.add_node('e')
+        moved = [key for key in self.keys if ring.get_node(key) != before[key]]
+        self.assertTrue(all(ring.get_node(key) == 'e' for key in moved))
+        self.assertAlmostEqual(len(moved), len(self.keys) / 5.0, delta=len(self.keys) * 0.07)
+
+    def test_remove_node_moves_only_its_keys(self):
+        """Test removing a node only moves the keys it owned"""
+        ring = HashRing(['a', 'b', 'c', 'd'])
+        before = dict((key, ring.get_node(key)) for key in self.keys)
+        ring.remove_node('b')
+        for key in self.keys:
+            if before[key] != 'b':
+                self.assertEqual(ring.get_node(key), before[key])
+            else:
+                self.assertNotEqual(ring.get_node(key), 'b')
+        self.assertEqual(ring.nodes, set(['a', 'c', 'd']))
+
+
+def keys_on_different_nodes(client, prefix):
+    """Return two keys owned by different nodes"""
+    first = prefix + ':0'
+    for i in range(1, 1000):
+        key = '%s:%d' % (prefix, i)
+        if client.get_node(key) != client.get_node(first):
+            return first, key
+    raise AssertionError("no keys found on different nodes")
+
+
+class TestShardedClientNotConnected(unittest.TestCase):
+    """Tests ShardedClient used before connect()"""
+
+    def setUp(self):
+        self.client = ShardedClient([("127.0.0.1", port) for port in NODE_PORTS])
+
+    def test_execute_not_connected(self):
+        """Test execute before connect raises ConnectionError"""
+        with self.assertRaises(ConnectionError) as context:
+            self.client.execute('GET', 'key')
+        self.assertIn('not connected', str(context.exception))
+
+    def test_mget_mset_not_connected(self):
+        """Test batches before connect raise ConnectionError"""
+        with self.assertRaises(ConnectionError):
+            self.client.mget('a', 'b')
+        with self.assertRaises(ConnectionError):
+            self.client.mset({'a': '1'})
+
+
+class TestShardedClient(unittest.TestCase):
+    """Tests ShardedClient against several local server instances"""
+
+    @classmethod
+    def setUpClass(cls):
+        for port in NODE_PORTS:
+            threading.Thread(target=run_server, args=(port,), daemon=True).start()
+        for port in NODE_PORTS:
+            wait_for_port(port)
+
+    def setUp(self):
+        self.client = ShardedClient([("127.0.0.1", port) for port in NODE_PORTS])
+        self.client.connect()
+
+    def tearDown(self):
+        self.client.disconnect()
+
+    def test_execute_routes_by_key(self):
+        """Test single-key commands go to the owning node"""
+        self.assertEqual(self.client.execute('SET', 'name', 'Alice'), 'OK')
+        self.assertEqual(self.client.execute('GET', 'name'), 'Alice')
+        owner = self.client._clients[self.client.get_node('name')]
+        self.assertEqual(owner.execute('GET', 'name'), 'Alice')
+
+    def test_mset_mget_keeps_order(self):
+        """Test batches are spread over nodes and merged back in order"""
+        mapping = dict(('batch:%d' % i, 'value:%d' % i) for i in range(200))
+        self.assertEqual(self.client.mset(mapping), 'OK')
+        keys = sorted(mapping, reverse=True) + ['batch:missing']
+        expected = [mapping[key] for key in keys[:-1]] + [None]
+        self.assertEqual(self.client.mget(*keys), expected)
+        self.assertEqual(len(set(self.client.get_node(key) for key in mapping)), 3)
+
+    def test_multi_key_command_cross_node(self):
+        """Test multi-key commands on keys owned by different nodes raise CROSSSLOT"""
+        src, dest = keys_on_different_nodes(self.client, 'hll')
+        self.client.execute('PFADD', src, 'a', 'b', 'c')
+        result = self.client.execute('PFMERGE', dest, src)
+        self.assertIsInstance(result, Error)
+        self.assertIn('CROSSSLOT', result.message)
+        result = self.client.execute('PFCOUNT', src, dest)
+        self.assertIsInstance(result, Error)
+        self.assertEqual(self.client.execute('PFCOUNT', dest), 0)
+
+    def test_multi_key_command_same_node(self):
+        """Test multi-key commands run when all keys share a node"""
+        src = 'same:0'
+        dest = next('same:%d' % i for i in range(1, 1000)
+                    if self.client.get_node('same:%d' % i) == self.client.get_node(src))
+        self.client.execute('PFADD', src, 'a', 'b', 'c')
+        self.assertEqual(self.client.execute('PFMERGE', dest, src), 'OK')
+        self.assertEqual(self.client.execute('PFCOUNT', dest), 3)
+
+    def test_mset_partial_write_on_error(self):
+        """Test mset returns a node's Error while other nodes keep their writes"""
+        failing = "127.0.0.1:%d" % NODE_PORTS[2]
+        failing_client = self.client._clients[failing]
+        # Simulate that node rejecting every SET in its batch
+        failing_client.execute_many = lambda commands: [Error("ERR rejected")] * len(commands)
+
+        keys = ['partial:%d' % i for i in range(100)]
+        result = self.client.mset(dict((key, key) for key in keys))
+        self.assertEqual(result, Error("ERR rejected"))
+
+        del failing_client.execute_many
+        for key, value in zip(keys, self.client.mget(*keys)):
+            if self.client.get_node(key) == failing:
+                self.assertIsNone(value)
+            else:
+                self.assertEqual(value, key)
+
+    def test_remove_node_does_not_migrate_keys(self):
+        """Test keys stored on a removed node read as missing afterwards"""
+        removed = "127.0.0.1:%d" % NODE_PORTS[1]
+        keys = ['before-remove:%d' % i for i in range(300)]
+        self.client.mset(dict((key, key) for key in keys))
+        owned = [key for key in keys if self.client.get_node(key) == removed]
+        self.assertTrue(owned)
+
+        self.client.remove_node("127.0.0.1", NODE_PORTS[1])
+        values = dict(zip(keys, self.client.mget(*keys)))
+        for key in keys:
+            if key in owned:
+                self.assertIsNone(values[key])
+            else:
+                self.assertEqual(values[key], key)
+
+    def test_remove_node(self):
+        """Test keys owned by a removed node are routed to the others"""
+        self.client.remove_node("127.0.0.1", NODE_PORTS[0])
+        keys = ['after-remove:%d' % i for i in range(50)]
+        self.client.mset(dict((key, key) for key in keys))
+        self.assertEqual(self.client.mget(*keys), keys)
+        self.assertNotIn("127.0.0.1:%d" % NODE_PORTS[0],
+                         set(self.client.get_node(key) for key in keys))
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)